@@ -0,0 +1,59 @@
+"""
+SQLite persistence for policy analyses.
+
+A single database file is shared by every worker process, so state is
+consistent no matter which worker handles a request. Connections are
+pooled per process and run in WAL mode, so readers never block the writer.
+"""
+import os
+
+import aiosqlite
+from aiosqlitepool import SQLiteConnectionPool
+from fastapi import Request
+
+# Location of the SQLite database file
+DATABASE_PATH = os.getenv("POLICY_DB_PATH", "policies.db")
+
+# Tenant names are stored once in the tenants table; policies refer to them
+# by integer key, which keeps rows and the tenant index small.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenants (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS policies (
+    id TEXT PRIMARY KEY,
+    tenant_key INTEGER REFERENCES tenants(id),
+    filename TEXT,
+    file_path TEXT,
+    file_url TEXT,
+    analysis_json BLOB NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_policies_tenant ON policies(tenant_key);
+"""
+
+
+async def _connect() -> aiosqlite.Connection:
+    """Open a connection in autocommit mode with WAL journaling."""
+    conn = await aiosqlite.connect(DATABASE_PATH, isolation_level=None)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+async def create_pool() -> SQLiteConnectionPool:
+    """
+    Create a connection pool and make sure the schema exists.
+    """
+    pool = SQLiteConnectionPool(_connect)
+    async with pool.connection() as conn:
+        await conn.executescript(SCHEMA)
+    return pool
+
+
+def get_pool(request: Request) -> SQLiteConnectionPool:
+    """
+    Dependency returning the connection pool created at application startup.
+    """
+    return request.app.state.pool
@@ -0,0 +1,62 @@
+"""
+Field extraction for uploaded policy documents.
+
+Extraction is CPU-bound, so it runs in a pool of worker processes rather
+than on the event loop, where it would stall every other request.
+Functions submitted to the pool must be module-level so they can be
+pickled by reference.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import Request
+
+# Number of extraction worker processes per API worker. By default the CPUs
+# are split between the WEB_CONCURRENCY API workers (gunicorn.conf.py
+# exports it), so a fully loaded server runs about one extraction process
+# per CPU in total rather than one per CPU in every API worker.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+EXTRACTION_WORKERS = int(os.getenv(
+    "EXTRACTION_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+))
+
+
+def create_executor() -> ProcessPoolExecutor:
+    """
+    Create the process pool used for field extraction.
+
+    Workers come from a forkserver rather than forking the server process,
+    whose database connection threads must not be copied into children.
+    The forkserver imports this module once up front, so each new worker
+    starts with its dependencies already loaded.
+    """
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS, mp_context=context)
+
+
+def get_executor(request: Request) -> ProcessPoolExecutor:
+    """
+    Dependency returning the extraction pool created at application startup.
+    """
+    return request.app.state.executor
+
+
+def extract_fields(path: str) -> list[dict]:
+    """
+    Extract policy fields from a decoded document on disk.
+
+    Runs in a worker process. In production this would run the AI/ML
+    extraction models; for now it returns a placeholder field.
+    """
+    return [
+        {
+            "name": "example_field",
+            "value": "This is a placeholder",
+            "confidence": 0.95,
+            "source_pages": [1],
+            "citation_text": "Sample citation",
+            "model_version": None
+        }
+    ]
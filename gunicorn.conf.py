@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for running the API under multiple Uvicorn workers.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+Every worker opens its own connection pool on the shared SQLite database
+during application startup, and closes it again on shutdown, so workers can
+be added or recycled without any extra coordination.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Workers inherit the master's environment; extraction.py sizes each
+# worker's extraction pool from this count
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Give in-flight requests and the lifespan shutdown time to finish
+graceful_timeout = 30
@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager
 from typing import Union
 
 from fastapi import FastAPI
 from pydantic import BaseModel
-from routers import policies
+from database import create_pool
+from extraction import create_executor
+from middleware import BodySizeLimitMiddleware
+from routers import health, policies
 
-app = FastAPI(title="Admin API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the database connection pool and the extraction process pool on
+    startup, and close both on shutdown.
+    """
+    app.state.executor = create_executor()
+    app.state.pool = await create_pool()
+    yield
+    await app.state.pool.close()
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# The default JSONResponse is kept on purpose: with a response_model set,
+# FastAPI serializes straight to JSON bytes through Pydantic, and a custom
+# default_response_class (such as ORJSONResponse) would disable that path.
+app = FastAPI(title="Admin API", version="1.0.0", lifespan=lifespan)
+
+# Reject oversized uploads before they are read or parsed
+app.add_middleware(BodySizeLimitMiddleware)
 
 # Include routers
 app.include_router(policies.router)
+app.include_router(health.router)
 
 
 # Example model for demo endpoints
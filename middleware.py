@@ -0,0 +1,62 @@
+"""
+ASGI middleware shared by the whole application.
+"""
+import os
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Largest request body accepted, in bytes (default: 64 MiB)
+MAX_REQUEST_BODY_SIZE = int(os.getenv("MAX_REQUEST_BODY_SIZE", 64 * 1024 * 1024))
+
+_TOO_LARGE_DETAIL = "Request body too large"
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than a fixed size with 413.
+    
+    A declared Content-Length over the limit is rejected before any of the
+    body is read. Bodies without one (chunked transfer) are counted as they
+    are received, and the request fails as soon as the limit is crossed, so
+    an oversized upload is never buffered or parsed in full.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int = MAX_REQUEST_BODY_SIZE):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    response = JSONResponse(
+                        {"detail": _TOO_LARGE_DETAIL},
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+        
+        received = 0
+        
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised inside request handling, where FastAPI turns it
+                    # into a 413 response
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=_TOO_LARGE_DETAIL
+                    )
+            return message
+        
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,25 @@
+from aiosqlitepool import SQLiteConnectionPool
+from fastapi import APIRouter, Depends, HTTPException, status
+from database import get_pool
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"]
+)
+
+
+@router.get("/")
+async def health_check(pool: SQLiteConnectionPool = Depends(get_pool)):
+    """
+    Check that this worker can reach the database through its pool.
+    """
+    try:
+        async with pool.connection() as conn:
+            await conn.execute("SELECT 1")
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+    
+    return {"status": "ok"}
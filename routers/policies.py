@@ -1,22 +1,85 @@
+import asyncio
+import binascii
 import datetime
+import os
+import tempfile
+import time
 import uuid
-from typing import Optional
-from fastapi import APIRouter, HTTPException, status
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Annotated, Optional
+import orjson
+from aiosqlitepool import SQLiteConnectionPool
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
+from database import get_pool
+from extraction import extract_fields, get_executor
+
+# pybase64 decodes and encodes with SIMD kernels picked at runtime, falling
+# back to its own scalar code on older CPUs. The stdlib codec takes over when
+# it is not installed; both raise binascii.Error on invalid input.
+try:
+    import pybase64 as b64codec
+except ImportError:  # pragma: no cover
+    import base64 as b64codec
 
 router = APIRouter(
     prefix="/policies",
     tags=["policies"]
 )
 
-# In-memory storage for demo purposes
-# In production, replace with actual database
-policy_storage = {}
+# Directory where retained (decoded) policy documents are written
+POLICY_FILES_DIR = os.getenv("POLICY_FILES_DIR", "policy_files")
+
+# Base64 text is read from the upload in fixed-size chunks so the full
+# payload is never buffered in memory
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Decoded bytes are re-encoded in chunks that are a multiple of 3, so each
+# chunk encodes to base64 without interior padding
+DOWNLOAD_CHUNK_SIZE = 48 * 1024
+
+_B64_WHITESPACE = b" \t\r\n"
+
+# Number of serialized get_policy bodies kept per process
+POLICY_RESPONSE_CACHE_SIZE = 1024
+
+# Clients may reuse a cached policy only after revalidating its ETag
+POLICY_CACHE_CONTROL = "private, no-cache"
+
+# Tenants are never deleted, so a tenant's key is stable once inserted.
+# INSERT_POLICY_SQL takes the tenant name and resolves its key itself.
+INSERT_TENANT_SQL = "INSERT OR IGNORE INTO tenants (name) VALUES (?)"
+INSERT_POLICY_SQL = (
+    "INSERT INTO policies (id, tenant_key, filename, file_path, file_url, analysis_json) "
+    "VALUES (?, (SELECT id FROM tenants WHERE name = ?), ?, ?, ?, ?)"
+)
+
+# Number of rows fetched and streamed at a time when listing policies
+LIST_BATCH_SIZE = 256
+
+# Listing queries, one batch at a time by keyset pagination on rowid. The
+# tenant filter is a plain equality so SQLite can seek idx_policies_tenant,
+# whose entries are ordered by rowid within a tenant; a combined
+# "?1 IS NULL OR tenant_id = ?1" predicate would force a full table scan
+# even when a tenant is given.
+LIST_ALL_SQL = (
+    "SELECT rowid, analysis_json, file_url FROM policies "
+    "WHERE rowid > :after ORDER BY rowid LIMIT :limit"
+)
+LIST_BY_TENANT_SQL = (
+    "SELECT rowid, analysis_json, file_url FROM policies "
+    "WHERE tenant_key = (SELECT id FROM tenants WHERE name = :tenant) "
+    "AND rowid > :after ORDER BY rowid LIMIT :limit"
+)
 
 
 # Pydantic Models
 class PolicyUploadRequest(BaseModel):
-    file_b64: str
+    file: UploadFile
     filename: Optional[str] = None
     tenant_id: Optional[str] = None
     retain: bool = Field(default=False)
@@ -32,12 +95,12 @@ class PolicyField(BaseModel):
 
 
 class PolicyAnalysis(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     tenant_id: Optional[str] = None
     provider: Optional[str] = None
     plan_type: Optional[str] = None
     extracted_fields: list[PolicyField]
-    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    created_at: datetime.datetime
     updated_at: Optional[datetime.datetime] = None
     expires_at: Optional[datetime.datetime] = None
 
@@ -57,141 +120,557 @@ class PolicyUpdateResponse(BaseModel):
     message: str = "Policy analysis updated successfully"
 
 
+# Internal storage record
+class Timestamp(float):
+    """
+    A POSIX timestamp that serializes as an ISO 8601 UTC datetime.
+    
+    Records keep plain float timestamps from time.time(); a datetime is only
+    materialized when the record is written out as JSON.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def now(cls) -> "Timestamp":
+        return cls(time.time())
+
+    @classmethod
+    def fromisoformat(cls, value: str) -> "Timestamp":
+        return cls(datetime.datetime.fromisoformat(value).timestamp())
+
+    def isoformat(self) -> str:
+        # Spell UTC as "Z", as Pydantic does, so stored and model-serialized
+        # timestamps are the same string
+        value = datetime.datetime.fromtimestamp(self, tz=datetime.timezone.utc).isoformat()
+        return value.removesuffix("+00:00") + "Z"
+
+
+def _orjson_default(obj):
+    """orjson fallback for types it does not serialize natively."""
+    if isinstance(obj, Timestamp):
+        return obj.isoformat()
+    raise TypeError
+
+
+@dataclass(slots=True)
+class PolicyRecord:
+    """
+    Stored form of a policy analysis.
+    
+    Pydantic models are only used at the request/response boundary. Records
+    are built from data that is already validated, so a plain slotted
+    dataclass avoids the validator pipeline and per-instance model state.
+    Field order matches PolicyAnalysis, so the serialized JSON has the same
+    shape.
+    """
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    tenant_id: Optional[str] = None
+    provider: Optional[str] = None
+    plan_type: Optional[str] = None
+    extracted_fields: list[dict] = field(default_factory=list)
+    created_at: Timestamp = field(default_factory=Timestamp.now)
+    updated_at: Optional[Timestamp] = None
+    expires_at: Optional[Timestamp] = None
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "PolicyRecord":
+        """Load a record from its stored JSON."""
+        record = cls(**orjson.loads(data))
+        for name in ("created_at", "updated_at", "expires_at"):
+            value = getattr(record, name)
+            if value is not None:
+                setattr(record, name, Timestamp.fromisoformat(value))
+        return record
+
+    def to_json(self) -> bytes:
+        """Serialize the record once, for storage alongside the row."""
+        # orjson serializes dataclasses natively; timestamps go through
+        # _orjson_default
+        return orjson.dumps(self, default=_orjson_default)
+
+
+# Response cache
+class PolicyResponseCache:
+    """
+    Bounded LRU of serialized get_policy bodies, keyed by policy id.
+    
+    Each entry remembers the row version it was built from. get_policy sends
+    that version along with its query and only gets the analysis JSON back
+    when the row has moved on, so an entry is never served after an update,
+    even one made by another worker process.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+
+    def get(self, policy_id: str) -> Optional[tuple[int, bytes]]:
+        """Return the cached (version, body) for a policy, if any."""
+        entry = self._entries.get(policy_id)
+        if entry is not None:
+            self._entries.move_to_end(policy_id)
+        return entry
+
+    def put(self, policy_id: str, version: int, body: bytes) -> None:
+        """Cache the body for a version of a policy, evicting the oldest entry when full."""
+        self._entries[policy_id] = (version, body)
+        self._entries.move_to_end(policy_id)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, policy_id: str) -> None:
+        """Drop the cached body for a policy, if any."""
+        self._entries.pop(policy_id, None)
+
+
+_response_cache = PolicyResponseCache(POLICY_RESPONSE_CACHE_SIZE)
+
+
+# Helpers
+def _envelope(analysis_json: bytes, file_url: Optional[str]) -> bytes:
+    """
+    Build a PolicyGetResponse body around pre-serialized analysis JSON.
+    
+    The stored analysis bytes are spliced in verbatim, so reads never
+    re-validate or re-serialize the extracted fields.
+    """
+    return b'{"analysis":' + analysis_json + b',"file_url":' + orjson.dumps(file_url) + b"}"
+
+
+def policy_file_url(policy_id: str) -> str:
+    """Build the download URL for a policy's retained file."""
+    return f"/policies/{policy_id}/file"
+
+
+def _etag(policy_id: str, version: int) -> str:
+    """Build the ETag for a given version of a policy analysis."""
+    return f'"{policy_id}-{version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _accepts_octet_stream(accept: Optional[str]) -> bool:
+    """
+    Check whether an Accept header explicitly asks for application/octet-stream.
+    
+    Wildcard ranges do not count, and a range with q=0 rejects the type.
+    """
+    if accept is None:
+        return False
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        if media_type.strip().lower() != "application/octet-stream":
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+async def _decode_upload(upload: UploadFile, out) -> int:
+    """
+    Stream-decode a base64 upload into a file object.
+
+    Chunks are decoded as they are read; any trailing characters that do not
+    make up a full 4-character base64 quantum are carried over to the next
+    chunk. Returns the number of decoded bytes written.
+    """
+    # One staging buffer is reused for the whole upload: each chunk is
+    # appended to the carried-over characters in place, the aligned prefix
+    # is decoded through a memoryview without copying, then dropped
+    pending = bytearray()
+    written = 0
+
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        pending += chunk.translate(None, _B64_WHITESPACE)
+        aligned = len(pending) - len(pending) % 4
+        if aligned:
+            decoded = b64codec.b64decode(memoryview(pending)[:aligned], validate=True)
+            written += await run_in_threadpool(out.write, decoded)
+            del pending[:aligned]
+
+    if pending:
+        raise binascii.Error("Incomplete base64 quantum at end of input")
+
+    return written
+
+
+def _encode_file(f):
+    """Yield the base64 encoding of an open stored file, one chunk at a time, then close it."""
+    # Read each chunk into the same buffer rather than allocating a new one
+    buf = bytearray(DOWNLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    with f:
+        while n := f.readinto(buf):
+            yield b64codec.b64encode(view[:n])
+
+
+def _no_retained_file(policy_id: str) -> HTTPException:
+    """Build the 404 raised when a policy has no retained file to download."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No retained file for policy analysis with id '{policy_id}'"
+    )
+
+
+async def _stream_policies(pool: SQLiteConnectionPool, query: str, params: dict):
+    """
+    Yield a JSON array of PolicyGetResponse bodies for the rows of a query.
+    
+    Rows are fetched and emitted in batches, so memory use is bounded by the
+    batch size rather than the number of policies listed. Each batch takes
+    a pooled connection only for its own query and resumes after the last
+    rowid seen, so a slow client never holds a connection or a read snapshot
+    while the response is being sent.
+    """
+    separator = b"["
+    after = 0
+    
+    while True:
+        async with pool.connection() as conn:
+            async with conn.execute(
+                query, {**params, "after": after, "limit": LIST_BATCH_SIZE}
+            ) as cursor:
+                rows = await cursor.fetchall()
+        
+        if not rows:
+            break
+        
+        yield separator + b",".join(
+            _envelope(analysis_json, file_url) for _, analysis_json, file_url in rows
+        )
+        separator = b","
+        after = rows[-1][0]
+        
+        if len(rows) < LIST_BATCH_SIZE:
+            break
+    
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def _open_upload_file(retain: bool):
+    """
+    Open the file an upload is decoded into: a file in the retained files
+    directory when retaining, otherwise a temporary file.
+    """
+    if retain:
+        os.makedirs(POLICY_FILES_DIR, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=POLICY_FILES_DIR, delete=False)
+    return tempfile.NamedTemporaryFile(delete=False)
+
+
+def _remove_file(path: Optional[str]) -> None:
+    """Remove a stored policy document, ignoring files that are already gone."""
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 # API Endpoints
+# Every handler is `async def` and runs on the event loop, so nothing in
+# these bodies may block: database access is awaited through the pool,
+# file-system calls go through run_in_threadpool and CPU-bound work is sent
+# to the extraction process pool. Declaring handlers as plain `def` instead
+# would add a threadpool hop per request for work that is already
+# non-blocking. Keep new blocking calls out of these bodies.
+#
+# Read paths serve data that was validated when it was stored, as
+# pre-serialized JSON. They declare no response_model, so FastAPI never
+# validates or re-encodes their output; `responses` documents the schema.
+# Upload also returns a pre-built Response, so its response_model only
+# documents the schema and is never applied. Update keeps a validated
+# response_model, as it returns a model built per request.
 @router.post("/", response_model=PolicyGetResponse, status_code=status.HTTP_201_CREATED)
-async def upload_policy(request: PolicyUploadRequest):
+async def upload_policy(
+    request: Annotated[PolicyUploadRequest, Form(media_type="multipart/form-data")],
+    pool: SQLiteConnectionPool = Depends(get_pool),
+    executor: ProcessPoolExecutor = Depends(get_executor)
+):
     """
     Upload and analyze a policy document.
     
-    - **file_b64**: Base64-encoded file content
-    - **filename**: Optional filename
+    - **file**: Base64-encoded file content, sent as a multipart file part
+    - **filename**: Optional filename (defaults to the uploaded file's name)
     - **tenant_id**: Optional tenant identifier
     - **retain**: Whether to retain the file after analysis
     """
-    # Create a new policy analysis
-    # In production, this would:
-    # 1. Decode and validate the file
-    # 2. Store the file (if retain=True)
-    # 3. Process/extract fields using AI/ML
-    # 4. Store analysis in database
+    # Decode straight to disk; files that are not retained are removed
+    # once extraction is done
+    out = await run_in_threadpool(_open_upload_file, request.retain)
+    keep_file = False
     
-    analysis = PolicyAnalysis(
-        tenant_id=request.tenant_id,
-        extracted_fields=[
-            PolicyField(
-                name="example_field",
-                value="This is a placeholder",
-                confidence=0.95,
-                source_pages=[1],
-                citation_text="Sample citation"
+    try:
+        try:
+            await _decode_upload(request.file, out)
+        except (binascii.Error, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File content is not valid base64"
             )
-        ]
+        finally:
+            await run_in_threadpool(out.close)
+        
+        # Extraction is CPU-bound, so it runs in a worker process and the
+        # event loop stays free to serve other requests meanwhile. It raises
+        # ValueError for documents it cannot make sense of; anything else is
+        # a server fault and is left to surface as a 500.
+        try:
+            extracted_fields = await asyncio.get_running_loop().run_in_executor(
+                executor, extract_fields, out.name
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Fields could not be extracted from the document"
+            )
+        keep_file = request.retain
+    finally:
+        if not keep_file:
+            await run_in_threadpool(_remove_file, out.name)
+    
+    record = PolicyRecord(
+        tenant_id=request.tenant_id,
+        extracted_fields=extracted_fields
     )
     
-    # Store in memory
-    policy_storage[analysis.id] = {
-        "analysis": analysis,
-        "file_b64": request.file_b64 if request.retain else None,
-        "filename": request.filename
-    }
+    analysis_json = record.to_json()
+    
+    # The file URL never changes, so it is built once here and read back
+    # verbatim instead of being formatted on every read
+    file_url = policy_file_url(record.id) if request.retain else None
     
-    # Generate file URL if retained
-    file_url = f"/policies/{analysis.id}/file" if request.retain else None
+    async with pool.connection() as conn:
+        if record.tenant_id is not None:
+            await conn.execute(INSERT_TENANT_SQL, (record.tenant_id,))
+        await conn.execute(
+            INSERT_POLICY_SQL,
+            (
+                record.id,
+                record.tenant_id,
+                request.filename or request.file.filename,
+                out.name if request.retain else None,
+                file_url,
+                analysis_json
+            )
+        )
     
-    return PolicyGetResponse(
-        analysis=analysis,
-        file_url=file_url
+    return Response(
+        content=_envelope(analysis_json, file_url),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json"
     )
 
 
-@router.get("/{policy_id}", response_model=PolicyGetResponse)
-async def get_policy(policy_id: str):
+@router.get(
+    "/{policy_id}",
+    responses={
+        status.HTTP_200_OK: {"model": PolicyGetResponse},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Policy analysis unchanged since the given ETag"}
+    }
+)
+async def get_policy(
+    policy_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    pool: SQLiteConnectionPool = Depends(get_pool)
+):
     """
     Retrieve a policy analysis by ID.
     
+    Responses carry an ETag; send it back in If-None-Match to get a
+    304 Not Modified while the analysis is unchanged.
+    
     - **policy_id**: The unique identifier of the policy analysis
     """
-    if policy_id not in policy_storage:
+    cached = _response_cache.get(policy_id)
+    cached_version = cached[0] if cached is not None else None
+    
+    # The analysis JSON is only read when the cached body is missing or
+    # stale; for an unchanged row this is a version check on the primary key
+    async with pool.connection() as conn:
+        async with conn.execute(
+            "SELECT version, CASE WHEN version = ? THEN NULL ELSE analysis_json END, file_url "
+            "FROM policies WHERE id = ?",
+            (cached_version, policy_id)
+        ) as cursor:
+            row = await cursor.fetchone()
+    
+    if row is None:
+        _response_cache.discard(policy_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Policy analysis with id '{policy_id}' not found"
         )
     
-    stored_policy = policy_storage[policy_id]
-    file_url = f"/policies/{policy_id}/file" if stored_policy.get("file_b64") else None
+    version, analysis_json, file_url = row
+    headers = {"ETag": _etag(policy_id, version), "Cache-Control": POLICY_CACHE_CONTROL}
     
-    return PolicyGetResponse(
-        analysis=stored_policy["analysis"],
-        file_url=file_url
-    )
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if analysis_json is None:
+        body = cached[1]
+    else:
+        body = _envelope(analysis_json, file_url)
+        _response_cache.put(policy_id, version, body)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.put("/{policy_id}", response_model=PolicyUpdateResponse)
-async def update_policy(policy_id: str, request: PolicyUpdateRequest):
+async def update_policy(
+    policy_id: str,
+    request: PolicyUpdateRequest,
+    pool: SQLiteConnectionPool = Depends(get_pool)
+):
     """
     Update an existing policy analysis.
     
     - **policy_id**: The unique identifier of the policy analysis
     - **updated_fields**: List of fields to update
     """
-    if policy_id not in policy_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Policy analysis with id '{policy_id}' not found"
-        )
-    
-    stored_policy = policy_storage[policy_id]
-    analysis = stored_policy["analysis"]
-    
-    # Update the fields
-    analysis.extracted_fields = request.updated_fields
-    analysis.updated_at = datetime.datetime.utcnow()
+    # The read and the write run in one IMMEDIATE transaction, so no other
+    # worker can delete or update the row in between
+    async with pool.connection() as conn:
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            async with conn.execute(
+                "SELECT analysis_json FROM policies WHERE id = ?",
+                (policy_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            
+            if row is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Policy analysis with id '{policy_id}' not found"
+                )
+            
+            # Stored JSON was validated on the way in, so it is loaded as-is
+            record = PolicyRecord.from_json(row[0])
+            
+            # Update the fields
+            record.extracted_fields = [f.model_dump() for f in request.updated_fields]
+            record.updated_at = Timestamp.now()
+            
+            await conn.execute(
+                "UPDATE policies SET analysis_json = ?, version = version + 1 WHERE id = ?",
+                (record.to_json(), policy_id)
+            )
+        except BaseException:
+            await conn.rollback()
+            raise
+        await conn.commit()
     
     return PolicyUpdateResponse(
         id=policy_id,
-        updated_at=analysis.updated_at
+        updated_at=record.updated_at.isoformat()
     )
 
 
-@router.get("/", response_model=list[PolicyGetResponse])
-async def list_policies(tenant_id: Optional[str] = None):
+@router.get("/", responses={status.HTTP_200_OK: {"model": list[PolicyGetResponse]}})
+async def list_policies(
+    tenant_id: Optional[str] = None,
+    pool: SQLiteConnectionPool = Depends(get_pool)
+):
     """
     List all policy analyses, optionally filtered by tenant.
     
     - **tenant_id**: Optional filter by tenant ID
     """
-    results = []
+    # Only the unfiltered listing walks the whole table
+    if tenant_id:
+        query, params = LIST_BY_TENANT_SQL, {"tenant": tenant_id}
+    else:
+        query, params = LIST_ALL_SQL, {}
     
-    for policy_id, stored_policy in policy_storage.items():
-        analysis = stored_policy["analysis"]
-        
-        # Filter by tenant_id if provided
-        if tenant_id and analysis.tenant_id != tenant_id:
-            continue
-        
-        file_url = f"/policies/{policy_id}/file" if stored_policy.get("file_b64") else None
-        
-        results.append(PolicyGetResponse(
-            analysis=analysis,
-            file_url=file_url
-        ))
-    
-    return results
+    return StreamingResponse(_stream_policies(pool, query, params), media_type="application/json")
 
 
 @router.delete("/{policy_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_policy(policy_id: str):
+async def delete_policy(policy_id: str, pool: SQLiteConnectionPool = Depends(get_pool)):
     """
     Delete a policy analysis.
     
     - **policy_id**: The unique identifier of the policy analysis
     """
-    if policy_id not in policy_storage:
+    async with pool.connection() as conn:
+        async with conn.execute(
+            "DELETE FROM policies WHERE id = ? RETURNING file_path",
+            (policy_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+    
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Policy analysis with id '{policy_id}' not found"
         )
     
-    del policy_storage[policy_id]
+    _response_cache.discard(policy_id)
+    await run_in_threadpool(_remove_file, row[0])
     return None
 
+
+@router.get("/{policy_id}/file")
+async def get_policy_file(
+    policy_id: str,
+    accept: Optional[str] = Header(default=None),
+    pool: SQLiteConnectionPool = Depends(get_pool)
+):
+    """
+    Download a retained policy document.
+    
+    Documents are stored decoded. By default they are returned as base64,
+    encoded on the fly so the base64 text is never held in memory in full.
+    Clients that send `Accept: application/octet-stream` get the raw bytes
+    instead, with no base64 round trip at all.
+    
+    - **policy_id**: The unique identifier of the policy analysis
+    """
+    async with pool.connection() as conn:
+        async with conn.execute(
+            "SELECT file_path, filename FROM policies WHERE id = ?",
+            (policy_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+    
+    if row is None or not row[0]:
+        raise _no_retained_file(policy_id)
+    
+    file_path, filename = row
+    
+    # Check for or open the file before the response starts, so a file
+    # removed by a concurrent delete is a 404 rather than a failed 200
+    if _accepts_octet_stream(accept):
+        if not await run_in_threadpool(os.path.isfile, file_path):
+            raise _no_retained_file(policy_id)
+        return FileResponse(file_path, media_type="application/octet-stream", filename=filename)
+    
+    try:
+        document = await run_in_threadpool(open, file_path, "rb")
+    except FileNotFoundError:
+        raise _no_retained_file(policy_id)
+    
+    return StreamingResponse(
+        _encode_file(document),
+        media_type="text/plain"
+    )
@@ -1,26 +1,108 @@
 """
 Shared pytest fixtures for API testing.
 """
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
+import database
 from main import app
-from routers.policies import policy_storage
+from routers import policies
+from routers.policies import (
+    INSERT_POLICY_SQL,
+    INSERT_TENANT_SQL,
+    POLICY_RESPONSE_CACHE_SIZE,
+    PolicyRecord,
+    PolicyResponseCache,
+    policy_file_url
+)
 
 
-@pytest.fixture
-def client():
+@pytest_asyncio.fixture
+async def client():
     """
-    Create a test client for the FastAPI application.
+    Create an async test client for the FastAPI application.
+    
+    Requests are dispatched in-process through httpx's ASGI transport. The
+    lifespan manager runs application startup and shutdown, which open and
+    close the database connection pool.
     """
-    return TestClient(app)
+    transport = httpx.ASGITransport(app=app)
+    async with LifespanManager(app), httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as test_client:
+        yield test_client
 
 
 @pytest.fixture(autouse=True)
-def clean_policy_storage():
+def policy_database(tmp_path, monkeypatch):
     """
-    Clear policy storage before each test to ensure test isolation.
+    Use a fresh database file for each test to ensure test isolation.
     """
-    policy_storage.clear()
-    yield
-    policy_storage.clear()
+    db_path = tmp_path / "policies.db"
+    monkeypatch.setattr(database, "DATABASE_PATH", str(db_path))
+    return db_path
 
+
+@pytest.fixture(autouse=True)
+def policy_response_cache(monkeypatch):
+    """
+    Start each test with an empty get_policy response cache.
+    """
+    cache = PolicyResponseCache(POLICY_RESPONSE_CACHE_SIZE)
+    monkeypatch.setattr(policies, "_response_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def policy_files_dir(tmp_path, monkeypatch):
+    """
+    Write retained policy documents to a per-test temporary directory.
+    """
+    files_dir = tmp_path / "policy_files"
+    monkeypatch.setattr(policies, "POLICY_FILES_DIR", str(files_dir))
+    return files_dir
+
+
+@pytest_asyncio.fixture
+async def seed_policies(client, policy_files_dir):
+    """
+    Insert policies directly into the database in a single transaction.
+    
+    Returns an async helper taking a list of (tenant_id, retain, filename)
+    tuples and returning the new policy ids in order. Retained policies get
+    a small document in the policy files directory, as an upload would. Use
+    it for tests that only need existing policies, instead of uploading each
+    one.
+    """
+    async def seed(rows):
+        records = [PolicyRecord(tenant_id=tenant_id) for tenant_id, _, _ in rows]
+        params = []
+        for record, (_, retain, filename) in zip(records, rows):
+            file_path = None
+            if retain:
+                policy_files_dir.mkdir(exist_ok=True)
+                document = policy_files_dir / record.id
+                document.write_bytes(b"Seeded policy document")
+                file_path = str(document)
+            params.append((
+                record.id,
+                record.tenant_id,
+                filename,
+                file_path,
+                policy_file_url(record.id) if retain else None,
+                record.to_json()
+            ))
+        
+        async with app.state.pool.connection() as conn:
+            await conn.execute("BEGIN")
+            await conn.executemany(
+                INSERT_TENANT_SQL,
+                [(record.tenant_id,) for record in records if record.tenant_id is not None]
+            )
+            await conn.executemany(INSERT_POLICY_SQL, params)
+            await conn.commit()
+        
+        return [record.id for record in records]
+    
+    return seed
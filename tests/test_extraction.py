@@ -0,0 +1,36 @@
+"""
+Unit tests for document field extraction.
+"""
+import asyncio
+from extraction import create_executor, extract_fields
+from routers.policies import PolicyField
+
+
+class TestExtractFields:
+    """Tests for the field extraction worker function."""
+    
+    def test_extract_fields_returns_policy_fields(self, tmp_path):
+        """Test that extracted fields match the PolicyField schema."""
+        document = tmp_path / "policy.pdf"
+        document.write_bytes(b"Sample policy document")
+        
+        fields = extract_fields(str(document))
+        
+        assert len(fields) >= 1
+        for field in fields:
+            assert PolicyField(**field).model_dump() == field
+    
+    async def test_extract_fields_in_executor(self, tmp_path):
+        """Test that extraction runs in the worker process pool."""
+        document = tmp_path / "policy.pdf"
+        document.write_bytes(b"Sample policy document")
+        executor = create_executor()
+        
+        try:
+            fields = await asyncio.get_running_loop().run_in_executor(
+                executor, extract_fields, str(document)
+            )
+        finally:
+            executor.shutdown()
+        
+        assert fields == extract_fields(str(document))
@@ -0,0 +1,24 @@
+"""
+Unit tests for the health router.
+"""
+from fastapi import status
+from main import app
+
+
+class TestHealthCheck:
+    """Tests for the health check endpoint."""
+    
+    async def test_health_check_success(self, client):
+        """Test the health check when the database is reachable."""
+        response = await client.get("/health/")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"status": "ok"}
+    
+    async def test_health_check_database_unavailable(self, client):
+        """Test the health check once the connection pool is closed."""
+        await app.state.pool.close()
+        
+        response = await client.get("/health/")
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
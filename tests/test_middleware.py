@@ -0,0 +1,60 @@
+"""
+Unit tests for the application middleware.
+"""
+import httpx
+import pytest_asyncio
+from fastapi import FastAPI, Request, status
+from middleware import BodySizeLimitMiddleware
+
+
+@pytest_asyncio.fixture
+async def limited_client():
+    """
+    Create a client for a minimal app that accepts bodies of up to 10 bytes.
+    """
+    limited_app = FastAPI()
+    limited_app.add_middleware(BodySizeLimitMiddleware, max_body_size=10)
+    
+    @limited_app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+    
+    transport = httpx.ASGITransport(app=limited_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestBodySizeLimit:
+    """Tests for the request body size limit."""
+    
+    async def test_body_within_limit(self, limited_client):
+        """Test that a body under the limit reaches the endpoint."""
+        response = await limited_client.post("/echo", content=b"0123456789")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"size": 10}
+    
+    async def test_content_length_over_limit(self, limited_client):
+        """Test that a declared Content-Length over the limit is rejected."""
+        response = await limited_client.post("/echo", content=b"0123456789A")
+        
+        assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+        assert "too large" in response.json()["detail"].lower()
+    
+    async def test_chunked_body_over_limit(self, limited_client):
+        """Test that a chunked body is rejected once it crosses the limit."""
+        response = await limited_client.post("/echo", content=_chunked(b"012345", b"6789AB"))
+        
+        assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+    
+    async def test_chunked_body_within_limit(self, limited_client):
+        """Test that a chunked body under the limit is accepted."""
+        response = await limited_client.post("/echo", content=_chunked(b"01234", b"56789"))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"size": 10}
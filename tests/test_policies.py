@@ -3,25 +3,33 @@ Unit tests for the policies router.
 """
 import base64
 import datetime
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from fastapi import status
+from database import SCHEMA
+from extraction import get_executor
+from main import app
+from routers import policies
+from routers.policies import LIST_BY_TENANT_SQL, PolicyResponseCache
 
 
 class TestPolicyUpload:
     """Tests for policy upload endpoint."""
     
-    def test_upload_policy_success(self, client):
+    async def test_upload_policy_success(self, client):
         """Test successful policy upload."""
         # Create a sample base64 file
         sample_file = base64.b64encode(b"Sample policy document").decode()
         
         payload = {
-            "file_b64": sample_file,
             "filename": "test_policy.pdf",
             "tenant_id": "tenant-123",
             "retain": True
         }
         
-        response = client.post("/policies/", json=payload)
+        response = await client.post("/policies/", files={"file": sample_file}, data=payload)
         
         assert response.status_code == status.HTTP_201_CREATED
         data = response.json()
@@ -42,17 +50,16 @@ class TestPolicyUpload:
         assert data["file_url"] is not None
         assert f"/policies/{analysis['id']}/file" in data["file_url"]
     
-    def test_upload_policy_without_retention(self, client):
+    async def test_upload_policy_without_retention(self, client):
         """Test policy upload without file retention."""
         sample_file = base64.b64encode(b"Sample policy document").decode()
         
         payload = {
-            "file_b64": sample_file,
             "filename": "test_policy.pdf",
             "retain": False
         }
         
-        response = client.post("/policies/", json=payload)
+        response = await client.post("/policies/", files={"file": sample_file}, data=payload)
         
         assert response.status_code == status.HTTP_201_CREATED
         data = response.json()
@@ -60,50 +67,84 @@ class TestPolicyUpload:
         # File URL should be None when retain=False
         assert data["file_url"] is None
     
-    def test_upload_policy_minimal_data(self, client):
+    async def test_upload_policy_minimal_data(self, client):
         """Test policy upload with only required fields."""
         sample_file = base64.b64encode(b"Minimal policy").decode()
         
-        payload = {
-            "file_b64": sample_file
-        }
-        
-        response = client.post("/policies/", json=payload)
+        response = await client.post("/policies/", files={"file": sample_file})
         
         assert response.status_code == status.HTTP_201_CREATED
         data = response.json()
         assert "analysis" in data
     
-    def test_upload_policy_missing_required_field(self, client):
+    async def test_upload_policy_missing_required_field(self, client):
         """Test policy upload with missing required field."""
         payload = {
             "filename": "test.pdf"
-            # Missing file_b64
+            # Missing file
         }
         
-        response = client.post("/policies/", json=payload)
+        response = await client.post("/policies/", data=payload)
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    async def test_upload_invalid_base64(self, client, policy_files_dir):
+        """Test that a truncated base64 payload is rejected."""
+        response = await client.post("/policies/", files={"file": b"U2FtcGxl="}, data={
+            "retain": True
+        })
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(policy_files_dir.iterdir()) == []
+    
+    async def test_upload_non_base64_characters(self, client):
+        """Test that characters outside the base64 alphabet are rejected."""
+        response = await client.post("/policies/", files={"file": b"U2Ft!!!!cGxl"})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    async def test_upload_extraction_failure(self, client, monkeypatch, policy_files_dir):
+        """Test that an extraction error is not reported as invalid base64."""
+        def reject_document(path):
+            raise ValueError("Unreadable document")
+        
+        # Run extraction in a thread so the patched function need not be picklable
+        monkeypatch.setattr(policies, "extract_fields", reject_document)
+        monkeypatch.setitem(app.dependency_overrides, get_executor, ThreadPoolExecutor)
+        
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        response = await client.post("/policies/", files={"file": sample_file}, data={
+            "retain": True
+        })
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert "base64" not in response.json()["detail"]
+        assert list(policy_files_dir.iterdir()) == []
+    
+    def test_upload_policy_documented_as_multipart(self):
+        """Test that the OpenAPI schema advertises a multipart upload body."""
+        request_body = app.openapi()["paths"]["/policies/"]["post"]["requestBody"]
+        
+        assert list(request_body["content"]) == ["multipart/form-data"]
 
 
 class TestPolicyGet:
     """Tests for getting policy endpoint."""
     
-    def test_get_policy_success(self, client):
+    async def test_get_policy_success(self, client):
         """Test successful retrieval of a policy."""
         # First, upload a policy
         sample_file = base64.b64encode(b"Sample policy").decode()
         upload_payload = {
-            "file_b64": sample_file,
             "tenant_id": "tenant-456",
             "retain": True
         }
         
-        upload_response = client.post("/policies/", json=upload_payload)
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data=upload_payload)
         policy_id = upload_response.json()["analysis"]["id"]
         
         # Now get the policy
-        response = client.get(f"/policies/{policy_id}")
+        response = await client.get(f"/policies/{policy_id}")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -112,46 +153,115 @@ class TestPolicyGet:
         assert data["analysis"]["tenant_id"] == "tenant-456"
         assert data["file_url"] is not None
     
-    def test_get_policy_not_found(self, client):
+    async def test_get_policy_not_found(self, client):
         """Test getting a non-existent policy."""
-        response = client.get("/policies/non-existent-id")
+        response = await client.get("/policies/non-existent-id")
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "not found" in response.json()["detail"].lower()
     
-    def test_get_policy_without_file(self, client):
+    async def test_get_policy_without_file(self, client):
         """Test getting a policy that doesn't have a retained file."""
         # Upload without retention
         sample_file = base64.b64encode(b"Sample policy").decode()
         upload_payload = {
-            "file_b64": sample_file,
             "retain": False
         }
         
-        upload_response = client.post("/policies/", json=upload_payload)
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data=upload_payload)
         policy_id = upload_response.json()["analysis"]["id"]
         
         # Get the policy
-        response = client.get(f"/policies/{policy_id}")
+        response = await client.get(f"/policies/{policy_id}")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["file_url"] is None
+    
+    async def test_get_policy_not_modified(self, client):
+        """Test conditional GET with a matching ETag returns 304."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file})
+        policy_id = upload_response.json()["analysis"]["id"]
+        
+        response = await client.get(f"/policies/{policy_id}")
+        etag = response.headers["etag"]
+        
+        cached_response = await client.get(
+            f"/policies/{policy_id}", headers={"If-None-Match": etag}
+        )
+        
+        assert cached_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached_response.headers["etag"] == etag
+        assert cached_response.content == b""
+    
+    async def test_get_policy_etag_changes_on_update(self, client):
+        """Test that updating a policy invalidates its ETag."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file})
+        policy_id = upload_response.json()["analysis"]["id"]
+        
+        response = await client.get(f"/policies/{policy_id}")
+        etag = response.headers["etag"]
+        
+        await client.put(f"/policies/{policy_id}", json={
+            "updated_fields": [{"name": "premium", "value": "1500"}]
+        })
+        
+        updated_response = await client.get(
+            f"/policies/{policy_id}", headers={"If-None-Match": etag}
+        )
+        
+        assert updated_response.status_code == status.HTTP_200_OK
+        assert updated_response.headers["etag"] != etag
+        assert updated_response.json()["analysis"]["extracted_fields"][0]["name"] == "premium"
+    
+    async def test_get_policy_served_from_cache(self, client):
+        """Test that an unchanged policy is served from the response cache."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file})
+        policy_id = upload_response.json()["analysis"]["id"]
+        
+        first_response = await client.get(f"/policies/{policy_id}")
+        
+        # Change the stored JSON without bumping the version: only the
+        # cached body can still carry the original fields
+        async with app.state.pool.connection() as conn:
+            await conn.execute(
+                "UPDATE policies SET analysis_json = ? WHERE id = ?",
+                (b'{"id":"tampered"}', policy_id)
+            )
+        
+        cached_response = await client.get(f"/policies/{policy_id}")
+        
+        assert cached_response.status_code == status.HTTP_200_OK
+        assert cached_response.content == first_response.content
+    
+    def test_response_cache_evicts_least_recently_used(self):
+        """Test that the response cache drops the least recently used entry when full."""
+        cache = PolicyResponseCache(maxsize=2)
+        cache.put("a", 1, b"A")
+        cache.put("b", 1, b"B")
+        cache.get("a")
+        cache.put("c", 1, b"C")
+        
+        assert cache.get("a") == (1, b"A")
+        assert cache.get("b") is None
+        assert cache.get("c") == (1, b"C")
 
 
 class TestPolicyUpdate:
     """Tests for updating policy endpoint."""
     
-    def test_update_policy_success(self, client):
+    async def test_update_policy_success(self, client):
         """Test successful policy update."""
         # First, upload a policy
         sample_file = base64.b64encode(b"Sample policy").decode()
         upload_payload = {
-            "file_b64": sample_file,
             "tenant_id": "tenant-789"
         }
         
-        upload_response = client.post("/policies/", json=upload_payload)
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data=upload_payload)
         policy_id = upload_response.json()["analysis"]["id"]
         
         # Update the policy
@@ -174,7 +284,7 @@ class TestPolicyUpdate:
             ]
         }
         
-        response = client.put(f"/policies/{policy_id}", json=update_payload)
+        response = await client.put(f"/policies/{policy_id}", json=update_payload)
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -184,7 +294,7 @@ class TestPolicyUpdate:
         assert data["message"] == "Policy analysis updated successfully"
         
         # Verify the update by getting the policy
-        get_response = client.get(f"/policies/{policy_id}")
+        get_response = await client.get(f"/policies/{policy_id}")
         updated_fields = get_response.json()["analysis"]["extracted_fields"]
         
         assert len(updated_fields) == 2
@@ -192,7 +302,7 @@ class TestPolicyUpdate:
         assert updated_fields[0]["value"] == "500000"
         assert updated_fields[1]["name"] == "premium"
     
-    def test_update_policy_not_found(self, client):
+    async def test_update_policy_not_found(self, client):
         """Test updating a non-existent policy."""
         update_payload = {
             "updated_fields": [
@@ -203,15 +313,41 @@ class TestPolicyUpdate:
             ]
         }
         
-        response = client.put("/policies/non-existent-id", json=update_payload)
+        response = await client.put("/policies/non-existent-id", json=update_payload)
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
     
-    def test_update_policy_empty_fields(self, client):
+    async def test_update_policy_blocks_concurrent_delete(
+        self, client, seed_policies, policy_database, monkeypatch
+    ):
+        """Test that no other writer can delete a policy while it is being updated."""
+        [policy_id] = await seed_policies([(None, False, None)])
+        load_record = policies.PolicyRecord.from_json
+        lock_errors = []
+        
+        def load_record_then_delete(data):
+            # Runs between the update's read and write, as another worker would
+            with closing(sqlite3.connect(policy_database, timeout=0)) as other:
+                try:
+                    other.execute("DELETE FROM policies WHERE id = ?", (policy_id,))
+                    other.commit()
+                except sqlite3.OperationalError as exc:
+                    lock_errors.append(exc)
+            return load_record(data)
+        
+        monkeypatch.setattr(policies.PolicyRecord, "from_json", staticmethod(load_record_then_delete))
+        
+        response = await client.put(f"/policies/{policy_id}", json={"updated_fields": []})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(lock_errors) == 1
+        assert (await client.get(f"/policies/{policy_id}")).status_code == status.HTTP_200_OK
+    
+    async def test_update_policy_empty_fields(self, client):
         """Test updating policy with empty fields list."""
         # Upload a policy first
         sample_file = base64.b64encode(b"Sample policy").decode()
-        upload_response = client.post("/policies/", json={"file_b64": sample_file})
+        upload_response = await client.post("/policies/", files={"file": sample_file})
         policy_id = upload_response.json()["analysis"]["id"]
         
         # Update with empty fields
@@ -219,27 +355,41 @@ class TestPolicyUpdate:
             "updated_fields": []
         }
         
-        response = client.put(f"/policies/{policy_id}", json=update_payload)
+        response = await client.put(f"/policies/{policy_id}", json=update_payload)
         
         assert response.status_code == status.HTTP_200_OK
+    
+    async def test_update_policy_timestamps(self, client):
+        """Test that timestamps are UTC and updated_at matches the stored analysis."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file})
+        analysis = upload_response.json()["analysis"]
+        
+        created_at = datetime.datetime.fromisoformat(analysis["created_at"])
+        assert created_at.utcoffset() == datetime.timedelta(0)
+        assert analysis["updated_at"] is None
+        
+        update_response = await client.put(f"/policies/{analysis['id']}", json={
+            "updated_fields": []
+        })
+        get_response = await client.get(f"/policies/{analysis['id']}")
+        
+        updated_at = update_response.json()["updated_at"]
+        assert updated_at == get_response.json()["analysis"]["updated_at"]
+        assert updated_at.endswith("Z")
+        assert datetime.datetime.fromisoformat(updated_at) >= created_at
+        assert get_response.json()["analysis"]["created_at"] == analysis["created_at"]
 
 
 class TestPolicyList:
     """Tests for listing policies endpoint."""
     
-    def test_list_all_policies(self, client):
+    async def test_list_all_policies(self, client, seed_policies):
         """Test listing all policies."""
-        # Upload multiple policies
-        sample_file = base64.b64encode(b"Sample policy").decode()
-        
-        for i in range(3):
-            client.post("/policies/", json={
-                "file_b64": sample_file,
-                "tenant_id": f"tenant-{i}"
-            })
+        await seed_policies([(f"tenant-{i}", False, None) for i in range(3)])
         
         # List all policies
-        response = client.get("/policies/")
+        response = await client.get("/policies/")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -247,26 +397,17 @@ class TestPolicyList:
         assert isinstance(data, list)
         assert len(data) == 3
     
-    def test_list_policies_by_tenant(self, client):
+    async def test_list_policies_by_tenant(self, client, seed_policies):
         """Test listing policies filtered by tenant."""
-        sample_file = base64.b64encode(b"Sample policy").decode()
-        
-        # Upload policies for different tenants
-        client.post("/policies/", json={
-            "file_b64": sample_file,
-            "tenant_id": "tenant-A"
-        })
-        client.post("/policies/", json={
-            "file_b64": sample_file,
-            "tenant_id": "tenant-A"
-        })
-        client.post("/policies/", json={
-            "file_b64": sample_file,
-            "tenant_id": "tenant-B"
-        })
+        # Seed policies for different tenants
+        await seed_policies([
+            ("tenant-A", False, None),
+            ("tenant-A", True, "a.pdf"),
+            ("tenant-B", False, None)
+        ])
         
         # List policies for tenant-A
-        response = client.get("/policies/?tenant_id=tenant-A")
+        response = await client.get("/policies/?tenant_id=tenant-A")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -275,9 +416,45 @@ class TestPolicyList:
         for policy in data:
             assert policy["analysis"]["tenant_id"] == "tenant-A"
     
-    def test_list_policies_empty(self, client):
+    async def test_list_policies_streams_in_batches(self, client, seed_policies, monkeypatch):
+        """Test that listings spanning several fetch batches are complete and ordered."""
+        monkeypatch.setattr(policies, "LIST_BATCH_SIZE", 2)
+        policy_ids = await seed_policies([("tenant-A", i % 2 == 0, None) for i in range(5)])
+        
+        response = await client.get("/policies/?tenant_id=tenant-A")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [policy["analysis"]["id"] for policy in data] == policy_ids
+        assert [policy["file_url"] is not None for policy in data] == [
+            True, False, True, False, True
+        ]
+        
+        file_response = await client.get(data[0]["file_url"])
+        assert file_response.status_code == status.HTTP_200_OK
+    
+    async def test_list_policies_releases_connection_between_batches(
+        self, client, seed_policies, monkeypatch
+    ):
+        """Test that a paused listing holds no connection and sees later writes."""
+        monkeypatch.setattr(policies, "LIST_BATCH_SIZE", 2)
+        policy_ids = await seed_policies([(None, False, None) for _ in range(3)])
+        
+        stream = policies._stream_policies(app.state.pool, policies.LIST_ALL_SQL, {})
+        first_batch = await anext(stream)
+        
+        # Rows written while the client is between batches are picked up
+        # by the next keyset query rather than hidden by an open snapshot
+        async with app.state.pool.connection() as conn:
+            await conn.execute("DELETE FROM policies WHERE id = ?", (policy_ids[2],))
+        
+        body = first_batch + b"".join([chunk async for chunk in stream])
+        
+        assert [policy["analysis"]["id"] for policy in orjson.loads(body)] == policy_ids[:2]
+    
+    async def test_list_policies_empty(self, client):
         """Test listing policies when none exist."""
-        response = client.get("/policies/")
+        response = await client.get("/policies/")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -285,74 +462,198 @@ class TestPolicyList:
         assert isinstance(data, list)
         assert len(data) == 0
     
-    def test_list_policies_no_match_tenant(self, client):
+    async def test_list_policies_no_match_tenant(self, client):
         """Test listing policies with tenant filter that matches nothing."""
         # Upload a policy
         sample_file = base64.b64encode(b"Sample policy").decode()
-        client.post("/policies/", json={
-            "file_b64": sample_file,
+        await client.post("/policies/", files={"file": sample_file}, data={
             "tenant_id": "tenant-X"
         })
         
         # Query for different tenant
-        response = client.get("/policies/?tenant_id=tenant-Y")
+        response = await client.get("/policies/?tenant_id=tenant-Y")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         
         assert len(data) == 0
+    
+    async def test_tenant_names_stored_once(self, client):
+        """Test that repeated uploads for a tenant share one tenants row."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        for tenant_id in ("tenant-A", "tenant-A", "tenant-B"):
+            await client.post("/policies/", files={"file": sample_file}, data={
+                "tenant_id": tenant_id
+            })
+        await client.post("/policies/", files={"file": sample_file})
+        
+        async with app.state.pool.connection() as conn:
+            async with conn.execute("SELECT name FROM tenants ORDER BY id") as cursor:
+                tenants = [name for name, in await cursor.fetchall()]
+        
+        assert tenants == ["tenant-A", "tenant-B"]
+        
+        response = await client.get("/policies/?tenant_id=tenant-A")
+        assert len(response.json()) == 2
+    
+    def test_list_policies_by_tenant_uses_index(self):
+        """Test that tenant filtering seeks the tenant index instead of scanning."""
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(SCHEMA)
+        
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN {LIST_BY_TENANT_SQL}",
+            {"tenant": "tenant-A", "after": 0, "limit": 10}
+        ).fetchall()
+        
+        assert any("idx_policies_tenant" in step[-1] for step in plan)
 
 
 class TestPolicyDelete:
     """Tests for deleting policy endpoint."""
     
-    def test_delete_policy_success(self, client):
+    async def test_delete_policy_success(self, client):
         """Test successful policy deletion."""
         # Upload a policy
         sample_file = base64.b64encode(b"Sample policy").decode()
-        upload_response = client.post("/policies/", json={"file_b64": sample_file})
+        upload_response = await client.post("/policies/", files={"file": sample_file})
         policy_id = upload_response.json()["analysis"]["id"]
         
         # Delete the policy
-        response = client.delete(f"/policies/{policy_id}")
+        response = await client.delete(f"/policies/{policy_id}")
         
         assert response.status_code == status.HTTP_204_NO_CONTENT
         
         # Verify it's deleted
-        get_response = client.get(f"/policies/{policy_id}")
+        get_response = await client.get(f"/policies/{policy_id}")
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
     
-    def test_delete_policy_not_found(self, client):
+    async def test_delete_policy_not_found(self, client):
         """Test deleting a non-existent policy."""
-        response = client.delete("/policies/non-existent-id")
+        response = await client.delete("/policies/non-existent-id")
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
     
-    def test_delete_policy_multiple_times(self, client):
+    async def test_delete_policy_multiple_times(self, client):
         """Test deleting the same policy twice."""
         # Upload a policy
         sample_file = base64.b64encode(b"Sample policy").decode()
-        upload_response = client.post("/policies/", json={"file_b64": sample_file})
+        upload_response = await client.post("/policies/", files={"file": sample_file})
         policy_id = upload_response.json()["analysis"]["id"]
         
         # First deletion should succeed
-        response1 = client.delete(f"/policies/{policy_id}")
+        response1 = await client.delete(f"/policies/{policy_id}")
         assert response1.status_code == status.HTTP_204_NO_CONTENT
         
         # Second deletion should fail
-        response2 = client.delete(f"/policies/{policy_id}")
+        response2 = await client.delete(f"/policies/{policy_id}")
         assert response2.status_code == status.HTTP_404_NOT_FOUND
 
 
+class TestPolicyFile:
+    """Tests for retained policy file download endpoint."""
+    
+    async def test_download_policy_file_roundtrip(self, client):
+        """Test that a retained file is returned as the same base64 content."""
+        # Larger than one chunk and wrapped at 76 columns, so chunk
+        # boundaries do not line up with base64 quanta
+        document = bytes(range(256)) * 1000
+        sample_file = base64.encodebytes(document)
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data={
+            "retain": True
+        })
+        file_url = upload_response.json()["file_url"]
+        
+        response = await client.get(file_url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert base64.b64decode(response.content) == document
+    
+    async def test_download_policy_file_raw(self, client):
+        """Test that clients accepting octet-stream get the decoded bytes."""
+        document = bytes(range(256)) * 1000
+        sample_file = base64.b64encode(document)
+        upload_response = await client.post(
+            "/policies/",
+            files={"file": ("upload.b64", sample_file)},
+            data={"filename": "policy.pdf", "retain": True}
+        )
+        file_url = upload_response.json()["file_url"]
+        
+        response = await client.get(file_url, headers={"Accept": "application/octet-stream"})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert 'filename="policy.pdf"' in response.headers["content-disposition"]
+        assert response.content == document
+    
+    async def test_download_policy_file_octet_stream_rejected(self, client):
+        """Test that octet-stream with q=0 falls back to base64."""
+        document = b"Sample policy document"
+        upload_response = await client.post(
+            "/policies/",
+            files={"file": base64.b64encode(document)},
+            data={"retain": True}
+        )
+        file_url = upload_response.json()["file_url"]
+        
+        response = await client.get(file_url, headers={
+            "Accept": "application/json, application/octet-stream;q=0"
+        })
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert base64.b64decode(response.content) == document
+    
+    async def test_download_policy_file_not_retained(self, client):
+        """Test downloading the file of a policy uploaded without retention."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file})
+        policy_id = upload_response.json()["analysis"]["id"]
+        
+        response = await client.get(f"/policies/{policy_id}/file")
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    async def test_download_policy_file_missing_on_disk(self, client, policy_files_dir):
+        """Test that a retained file removed from disk is a 404, not a truncated 200."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data={
+            "retain": True
+        })
+        for stored_file in policy_files_dir.iterdir():
+            stored_file.unlink()
+        
+        file_url = upload_response.json()["file_url"]
+        
+        response = await client.get(file_url)
+        raw_response = await client.get(file_url, headers={"Accept": "application/octet-stream"})
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert raw_response.status_code == status.HTTP_404_NOT_FOUND
+    
+    async def test_delete_policy_removes_file(self, client, policy_files_dir):
+        """Test that deleting a policy removes its retained file."""
+        sample_file = base64.b64encode(b"Sample policy").decode()
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data={
+            "retain": True
+        })
+        policy_id = upload_response.json()["analysis"]["id"]
+        assert len(list(policy_files_dir.iterdir())) == 1
+        
+        await client.delete(f"/policies/{policy_id}")
+        
+        assert list(policy_files_dir.iterdir()) == []
+
+
 class TestPolicyIntegration:
     """Integration tests for policy workflows."""
     
-    def test_full_policy_lifecycle(self, client):
+    async def test_full_policy_lifecycle(self, client):
         """Test complete policy lifecycle: upload, get, update, list, delete."""
         # 1. Upload
         sample_file = base64.b64encode(b"Complete lifecycle test").decode()
-        upload_response = client.post("/policies/", json={
-            "file_b64": sample_file,
+        upload_response = await client.post("/policies/", files={"file": sample_file}, data={
             "filename": "lifecycle_test.pdf",
             "tenant_id": "lifecycle-tenant",
             "retain": True
@@ -362,12 +663,12 @@ class TestPolicyIntegration:
         policy_id = upload_response.json()["analysis"]["id"]
         
         # 2. Get
-        get_response = client.get(f"/policies/{policy_id}")
+        get_response = await client.get(f"/policies/{policy_id}")
         assert get_response.status_code == status.HTTP_200_OK
         assert get_response.json()["analysis"]["tenant_id"] == "lifecycle-tenant"
         
         # 3. Update
-        update_response = client.put(f"/policies/{policy_id}", json={
+        update_response = await client.put(f"/policies/{policy_id}", json={
             "updated_fields": [
                 {
                     "name": "policy_number",
@@ -378,42 +679,33 @@ class TestPolicyIntegration:
         assert update_response.status_code == status.HTTP_200_OK
         
         # 4. List
-        list_response = client.get("/policies/?tenant_id=lifecycle-tenant")
+        list_response = await client.get("/policies/?tenant_id=lifecycle-tenant")
         assert list_response.status_code == status.HTTP_200_OK
         assert len(list_response.json()) == 1
         
         # 5. Delete
-        delete_response = client.delete(f"/policies/{policy_id}")
+        delete_response = await client.delete(f"/policies/{policy_id}")
         assert delete_response.status_code == status.HTTP_204_NO_CONTENT
         
         # Verify deletion
-        final_get = client.get(f"/policies/{policy_id}")
+        final_get = await client.get(f"/policies/{policy_id}")
         assert final_get.status_code == status.HTTP_404_NOT_FOUND
     
-    def test_multiple_tenants_isolation(self, client):
+    async def test_multiple_tenants_isolation(self, client, seed_policies):
         """Test that policies from different tenants are properly isolated."""
-        sample_file = base64.b64encode(b"Tenant isolation test").decode()
-        
         # Create policies for different tenants
-        tenant_a_response = client.post("/policies/", json={
-            "file_b64": sample_file,
-            "tenant_id": "tenant-alpha"
-        })
-        tenant_b_response = client.post("/policies/", json={
-            "file_b64": sample_file,
-            "tenant_id": "tenant-beta"
-        })
-        
-        tenant_a_id = tenant_a_response.json()["analysis"]["id"]
-        tenant_b_id = tenant_b_response.json()["analysis"]["id"]
+        tenant_a_id, tenant_b_id = await seed_policies([
+            ("tenant-alpha", False, None),
+            ("tenant-beta", False, None)
+        ])
         
         # Verify tenant A can only see their policy
-        tenant_a_list = client.get("/policies/?tenant_id=tenant-alpha")
+        tenant_a_list = await client.get("/policies/?tenant_id=tenant-alpha")
         assert len(tenant_a_list.json()) == 1
         assert tenant_a_list.json()[0]["analysis"]["id"] == tenant_a_id
         
         # Verify tenant B can only see their policy
-        tenant_b_list = client.get("/policies/?tenant_id=tenant-beta")
+        tenant_b_list = await client.get("/policies/?tenant_id=tenant-beta")
         assert len(tenant_b_list.json()) == 1
         assert tenant_b_list.json()[0]["analysis"]["id"] == tenant_b_id
 